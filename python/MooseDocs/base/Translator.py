@@ -122,6 +122,22 @@ class Translator(mixins.ConfigObject):
 
         self.__executioner.addPage(page)
 
+    def addPages(self, nodes):
+        """
+        Add a list of additional pages to the list of available pages, see addPage.
+
+        Inputs:
+          nodes[list]: A list of pages.Page objects to insert into the list, any other iterable
+                       (e.g., a generator) is converted to a list first
+        """
+        if self.__initialized:
+            msg = "The {} object has already been initialized, the addPages method must be called " \
+                  "prior to initialization. Extension objects can add pages within the init() " \
+                  "method."
+            raise MooseDocs.common.exceptions.MooseDocsException(msg, type(self))
+
+        self.__executioner.addPages(nodes)
+
     def getPages(self):
         """Return the Page objects"""
         return self.__executioner.getPages()
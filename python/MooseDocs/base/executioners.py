@@ -128,6 +128,13 @@ class Executioner(mixins.ConfigObject, mixins.TranslatorObject):
         page._Page__unique_id = len(self._page_objects)
         self._page_objects.append(page)
 
+    def addPages(self, nodes):
+        """Add a list (or other iterable) of Page objects to be Translated."""
+        nodes = list(nodes)
+        for uid, page in enumerate(nodes, start=len(self._page_objects)):
+            page._Page__unique_id = uid
+        self._page_objects.extend(nodes)
+
     def getPages(self):
         """Return a list of Page objects."""
         return self._page_objects
@@ -7,8 +7,15 @@
 #* Licensed under LGPL 2.1, please see LICENSE for details
 #* https://www.gnu.org/licenses/lgpl-2.1.html
 import os
+import sys
+import glob
+import json
+import hashlib
+import tempfile
 import logging
 import time
+import functools
+import concurrent.futures
 import mooseutils
 import collections
 import uuid
@@ -21,9 +28,139 @@ from . import command, core
 
 LOG = logging.getLogger(__name__)
 
+# Test status values that are collected, each maps to the interned status and lower case status
+# strings used for rendering
+_STATUS = {s: (sys.intern(s), sys.intern(s.lower())) for s in ('OK', 'FAIL', 'DIFF', 'TIMEOUT')}
+
 def make_extension(**kwargs):
     return CivetExtension(**kwargs)
 
+@functools.lru_cache(maxsize=None)
+def _cached_civet_hashes(start, author, working_dir):
+    """
+    Return the CIVET hashes for the supplied branch and author, see mooseutils.git_civet_hashes.
+
+    The merge commits do not change during a build, so the result is cached for the life of the
+    process to avoid calling git for each command and remote.
+    """
+    return mooseutils.git_civet_hashes(start=start, author=author, working_dir=working_dir)
+
+@functools.lru_cache(maxsize=None)
+def _cached_git_commit(working_dir):
+    """
+    Return the current SHA for the repository, see mooseutils.git_commit.
+
+    The HEAD does not change during a build, so git is called once per location.
+    """
+    return mooseutils.git_commit(working_dir=working_dir)
+
+@functools.lru_cache(maxsize=4096)
+def _relpath(path, start):
+    """
+    Cached os.path.relpath, the same report pages are linked from the same locations many times.
+    """
+    return os.path.relpath(path, start)
+
+def _results_fingerprint(*items):
+    """
+    Return a short hash of the supplied strings, used to name the cached test result databases.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    for item in items:
+        h.update(item.encode('utf8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+def _results_cache_filename(local, name, site, hashes, branch, author):
+    """
+    Return the filename of the cached test result database for the remote *name*.
+
+    The name includes a fingerprint of the supplied items and the job archives currently in the
+    *local* directory, so the cache is not used if the merge commits or the archives change.
+    """
+    archives = sorted(glob.glob(os.path.join(local, 'results_*.tar.gz')))
+    fp = _results_fingerprint(branch, author, *site, *(hashes or []), *archives)
+    return os.path.join(local, 'db_{}_{}.json'.format(name, fp))
+
+def _prune_results_cache(filename, name):
+    """
+    Remove the cached test result databases for the remote *name*, other than *filename*.
+    """
+    pattern = 'db_{}_{}.json'.format(glob.escape(name), '[0-9a-f]' * 16)
+    for old in glob.glob(os.path.join(os.path.dirname(filename), pattern)):
+        if old != filename:
+            try:
+                os.remove(old)
+            except OSError as e:
+                LOG.warning("Failed to remove cached CIVET results %s: %s", old, e)
+
+def _load_results_cache(filename):
+    """
+    Return the test result database stored in *filename*, None is returned if it does not exist or
+    is unreadable.
+
+    The file is JSON, so the job numbers are restored from the string keys and the results are
+    converted back to mooseutils.civet_results.Test objects.
+    """
+    if not os.path.isfile(filename):
+        return None
+    try:
+        with open(filename, 'r', encoding='utf8') as fid:
+            data = json.load(fid)
+        return {tname: {int(job): [mooseutils.civet_results.Test(*t) for t in tests]
+                        for job, tests in jobs.items()} for tname, jobs in data.items()}
+    except Exception as e:
+        LOG.warning("Failed to load cached CIVET results from %s: %s", filename, e)
+    return None
+
+def _dump_results_cache(filename, database):
+    """
+    Write the test result *database* to *filename*, as JSON.
+
+    The file is written to a temporary location and then renamed, so a partial file is never read
+    by a concurrent or later build.
+    """
+    location = os.path.dirname(filename)
+    os.makedirs(location, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', encoding='utf8', dir=location, delete=False) as fid:
+        try:
+            json.dump(database, fid)
+        except Exception:
+            fid.close()
+            os.remove(fid.name)
+            raise
+    os.replace(fid.name, filename)
+
+def _get_civet_results(name, local, hashes, site, cache_key=None):
+    """
+    Return the test result database for the remote *name*, see mooseutils.get_civet_results.
+
+    If *cache_key* is supplied, as a (branch, author) tuple, the database is written for use by
+    later builds and the previously cached databases for the remote are removed. The filename is
+    computed after the download, so that it includes the archives that were just added.
+    """
+    if hashes is not None:
+        LOG.info("Downloading CIVET results for '%s' category into %s", name, local)
+    database = mooseutils.get_civet_results(local=local,
+                                            hashes=hashes,
+                                            site=site,
+                                            cache=local,
+                                            possible=list(_STATUS),
+                                            logger=LOG)
+    if cache_key is not None:
+        branch, author = cache_key
+        filename = _results_cache_filename(local, name, site, hashes, branch, author)
+        database = {tname: dict(jobs) for tname, jobs in database.items()}
+        _dump_results_cache(filename, database)
+        _prune_results_cache(filename, name)
+    return database
+
+def _gather_civet_results(items):
+    """
+    Serially call _get_civet_results for each (index, args) item, returning (index, database) pairs.
+    """
+    return [(index, _get_civet_results(*args)) for index, args in items]
+
 CivetTestBadges = tokens.newToken('CivetTestBadges', prefix=None, tests=list())
 CivetTestReport = tokens.newToken('CivetTestReport', prefix=None, tests=list(), source=None)
 
@@ -33,7 +170,7 @@ class CivetExtension(command.CommandExtension):
     @staticmethod
     def defaultConfig():
         config = command.CommandExtension.defaultConfig()
-        config['remotes'] = (dict(), "Remote CIVET repositories to pull result; each item in the dict should have another dict with a 'url' and 'repo' key.")
+        config['remotes'] = (dict(), "Remote CIVET repositories to pull result; each item in the dict should have another dict with a 'url' and 'repo' key. The results for remotes with a separate 'test_results_cache' location are downloaded in parallel.")
         config['branch'] = ('master', "The main stable branch for extracting test results.")
         config['author'] = ('moosetest', "The 'author' of the merge commit into the stable main branch.")
 
@@ -41,13 +178,18 @@ class CivetExtension(command.CommandExtension):
         config['generate_test_reports'] = (True, "Generate test report pages, if results exist from download or local file(s).")
         config['test_reports_location'] = ('civet', "The local directory where the generated test reports will be inserted.")
         config['test_results_cache'] = (os.path.join(os.getenv('HOME'), '.local', 'share', 'civet', 'jobs'),
-                                       "Default location for downloading CIVET results.")
+                                       "Default location for downloading CIVET results, remotes that share this location are downloaded serially.")
+        config['cache_test_results'] = (False, "Store the aggregated test results in the 'test_results_cache' location and reuse them on later builds if the merge commits and local results are unchanged. A cached database skips the CIVET 'sha_events' query, so jobs that finish later for the same merge commits are not included until new local results or merge commits invalidate the cache.")
         return config
 
     def __init__(self, *args, **kwargs):
         command.CommandExtension.__init__(self, *args, **kwargs)
-        self.__database = dict()
+        self.__reports = dict()
+        self.__counts = dict()
         self.__test_result_numbers = dict()
+        self.__test_report_files = dict()
+        self.__index_source = None
+        self.__index_links = list()
         self.__has_test_reports = False
 
     def hasTestReports(self):
@@ -69,8 +211,17 @@ class CivetExtension(command.CommandExtension):
             renderer.addCSS('civet_moose', "css/civet_moose.css")
 
     def results(self, name):
-        """Return the test results for the supplied name."""
-        return self.__database.get(name, None)
+        """
+        Return the test results for the supplied name.
+
+        The results are a list of (status, lower case status, recipe, url, job) tuples, one for
+        each recipe.
+        """
+        return self.__reports.get(name, None)
+
+    def counts(self, name):
+        """Return the number of results for each status for the supplied name."""
+        return self.__counts.get(name, dict())
 
     def testBaseFileName(self, test):
         """
@@ -78,65 +229,117 @@ class CivetExtension(command.CommandExtension):
         """
         return self.__test_result_numbers.get(test, None)
 
+    def testReportFileName(self, test):
+        """
+        Return the complete path to the rendered test report page.
+        """
+        return self.__test_report_files.get(test, None)
+
     def init(self):
         """(override) Generate test reports."""
 
-        # Test result database
-        self.__database = dict()
+        # Test result database, this is only needed within this method (see below)
+        database = dict()
+
+        # The timing is only needed when the messages are shown
+        log = LOG.isEnabledFor(logging.INFO)
 
         # Only populate the database if the specified branch and author match current repository
         if mooseutils.git_is_branch(self.get('branch')) and \
            mooseutils.git_is_config('user.name', self.get('author')):
 
-            start = time.time()
-            LOG.info("Collecting CIVET results...")
+            if log:
+                LOG.info("Collecting CIVET results...")
+                start = time.time()
+            databases = list()
+            downloads = collections.defaultdict(list)
             for name, category in self.get('remotes').items():
                 working_dir = mooseutils.eval_path(category.get('location', MooseDocs.ROOT_DIR))
                 LOG.info("Gathering CIVET results for '%s' category in %s", name, working_dir)
                 hashes = None
                 if category.get('download_test_results', self.get('download_test_results', True)):
-                    hashes = mooseutils.git_civet_hashes(start=self.get('branch'), author=self.get('author'), working_dir=working_dir)
-                    LOG.info("Downloading CIVET results for '%s' category in %s", name, working_dir)
+                    hashes = _cached_civet_hashes(self.get('branch'), self.get('author'), working_dir)
 
                 local = mooseutils.eval_path(category.get('test_results_cache', self.get('test_results_cache')))
                 site = (category['url'], category['repo'])
-                local_db = mooseutils.get_civet_results(local=local,
-                                                        hashes=hashes,
-                                                        site=site,
-                                                        cache=local,
-                                                        possible=['OK', 'FAIL', 'DIFF', 'TIMEOUT'],
-                                                        logger=LOG)
-                self.__database.update(local_db)
-            LOG.info("Collecting CIVET results complete [%s sec.]", time.time() - start)
-
-        if not self.__database and self.get('generate_test_reports', True):
+
+                local_db = None
+                cache_key = None
+                if self.get('cache_test_results', False):
+                    cache_key = (self.get('branch'), self.get('author'))
+                    cache_file = _results_cache_filename(local, name, site, hashes, *cache_key)
+                    local_db = _load_results_cache(cache_file)
+                    if local_db is not None:
+                        LOG.info("Using cached CIVET results for '%s' category from %s", name, cache_file)
+
+                if local_db is None:
+                    downloads[local].append((len(databases), (name, local, hashes, site, cache_key)))
+                databases.append(local_db)
+
+            # Downloading is dominated by waiting on HTTP requests, so the remotes are gathered
+            # concurrently. Remotes that share a cache directory are handled serially by the same
+            # worker, because each download also reads the archives in the directory, so only
+            # remotes with separate 'test_results_cache' locations are downloaded in parallel.
+            if downloads:
+                workers = min(8, len(downloads))
+                with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(_gather_civet_results, items) for items in downloads.values()]
+                    for future in futures:
+                        for index, local_db in future.result():
+                            databases[index] = local_db
+
+            # Update in the order of the remotes, so that results and page names are repeatable
+            for local_db in databases:
+                database.update(local_db)
+            if log:
+                LOG.info("Collecting CIVET results complete [%s sec.]", time.time() - start)
+
+        # Only the items needed by the renderers are kept from the complete results, which also
+        # contain the caveats, reason, and time for every recipe. The status counts are computed
+        # once because the same test is often rendered as badges on many pages.
+        self.__reports = dict()
+        self.__counts = dict()
+        for tname, jobs in database.items():
+            report = [(*_STATUS[r.status], r.recipe, r.url, str(job))
+                      for job, recipes in jobs.items() for r in recipes]
+            self.__reports[tname] = report
+            self.__counts[tname] = dict(collections.Counter(item[0] for item in report))
+
+        if not self.__reports and self.get('generate_test_reports', True):
             LOG.info("CIVET test result reports are being disabled, it requires results to exist and the specified branch ('%s') and author ('%s') to match the current repository.", self.get('branch'), self.get('author'))
             self.update(generate_test_reports=False)
 
         if self.get('generate_test_reports', True):
             self.__has_test_reports = True
-            start = time.time()
-            LOG.info("Creating CIVET result pages...")
+            if log:
+                LOG.info("Creating CIVET result pages...")
+                start = time.time()
 
             report_root = self.get('test_reports_location')
             if not self.translator.findPage(report_root, exact=True, throw_on_zero=False):
                 self.translator.addPage(pages.Directory(report_root, source=report_root))
 
-            src = pages.Source('{}/index.md'.format(report_root), source='{}/index.md'.format(report_root),
-                               read=False, tokenize=False)
+            index = f'{report_root}/index.md'
+            src = pages.Source(index, source=index, read=False, tokenize=False)
             self.translator.addPage(src)
+            self.__index_source = index
 
-            count = 0
-            for key, item in self.__database.items():
-                name = 'result_{}'.format(count)
+            destination = os.path.join(self.translator.get('destination'), report_root) + os.sep
+            prefix = report_root + '/'
+            report_pages = list()
+            for count, key in enumerate(self.__reports):
+                name = f'result_{count}'
                 self.__test_result_numbers[key] = name
-                count += 1
+                self.__test_report_files[key] = f'{destination}{name}.html'
+                self.__index_links.append((f'{name}.html', key))
 
-                fullname = '{}/{}.md'.format(report_root, name)
-                src = pages.Source(fullname, source=fullname, read=False, tokenize=False, key=key)
-                self.translator.addPage(src)
+                fullname = f'{prefix}{name}.md'
+                report_pages.append(pages.Source(fullname, source=fullname, read=False,
+                                                 tokenize=False, key=key))
+            self.translator.addPages(report_pages)
 
-            LOG.info("Creating CIVET result pages complete [%s sec.]", time.time() - start)
+            if log:
+                LOG.info("Creating CIVET result pages complete [%s sec.]", time.time() - start)
 
     def postTokenize(self, page, ast):
         """
@@ -156,12 +359,10 @@ class CivetExtension(command.CommandExtension):
         """
         Add CIVET links to test result pages.
         """
-        report_root = self.get('test_reports_location')
-        if page.source == '{}/index.md'.format(report_root):
+        if page.source == self.__index_source:
             ol = html.Tag(results, 'ol')
-            for key, item in self.__database.items():
-                fullname = self.testBaseFileName(key) + '.html'
-                html.Tag(html.Tag(ol, 'li'), 'a', href=fullname, string=key)
+            for href, key in self.__index_links:
+                html.Tag(html.Tag(ol, 'li'), 'a', href=href, string=key)
 
 class CivetCommandBase(command.CommandComponent):
     COMMAND = 'civet'
@@ -197,8 +398,9 @@ class CivetMergeResultsCommand(CivetCommandBase):
         site, repo = self.getCivetInfo()
 
         rows = []
-        for sha in mooseutils.git_civet_hashes(start=self.extension.get('branch'),
-                                               author=self.extension.get('author')):
+        for sha in _cached_civet_hashes(self.extension.get('branch'),
+                                        self.extension.get('author'),
+                                        MooseDocs.ROOT_DIR):
             url = '{}/sha_events/{}/{}'.format(site, repo, sha)
             link = core.Link(parent, url=url, string=sha)
             core.LineBreak(parent)
@@ -214,7 +416,7 @@ class CivetResultsCommand(CivetCommandBase):
 
     def createToken(self, parent, info, page):
         site, repo = self.getCivetInfo()
-        sha = mooseutils.git_commit()
+        sha = _cached_git_commit(MooseDocs.ROOT_DIR)
         url = '{}/sha_events/{}/{}'.format(site, repo, sha)
         if info['inline']:
             return core.Link(parent, url=url)
@@ -255,22 +457,22 @@ class RenderCivetTestBadges(components.RenderComponent):
 
     def createMaterialize(self, parent, token, page):
 
+        # The extension methods are bound once, they are called for every test
+        get_counts = self.extension.counts
+        get_filename = self.extension.testReportFileName
+        has_reports = self.extension.hasTestReports()
+        if has_reports:
+            # The output directory is computed once for all the tests in the token
+            page_dir = os.path.dirname(page.destination)
+
         div = html.Tag(parent, 'div', class_='moose-civet-badges')
         prefix = token['prefix']
-        for test in token['tests']:
-            tname = '{}.{}'.format(prefix, test) if (prefix is not None) else test
-            counts = collections.defaultdict(int)
-            results = self.extension.results(tname)
-            if results:
-                for job, recipes in results.items():
-                    for recipe in recipes:
-                        counts[recipe.status] += 1
-
-            base = self.extension.testBaseFileName(tname)
-            if self.extension.hasTestReports() and (base is not None):
-                report_root = self.extension.get('test_reports_location')
-                fname = os.path.join(self.translator.get("destination"), report_root, base + '.html')
-                location = os.path.relpath(fname, os.path.dirname(page.destination))
+        names = token['tests'] if (prefix is None) else [f'{prefix}.{t}' for t in token['tests']]
+        for tname in names:
+            counts = get_counts(tname)
+            fname = get_filename(tname)
+            if has_reports and (fname is not None):
+                location = _relpath(fname, page_dir)
                 a = html.Tag(div, 'a', href=location)
             else:
                 a = html.Tag(div, 'span')
@@ -278,7 +480,7 @@ class RenderCivetTestBadges(components.RenderComponent):
             for key, count in counts.items():
                 badge = html.Tag(a, 'span', class_="new badge", string=str(count))
                 badge['data-badge-caption'] = key
-                badge['data-status'] = key.lower()
+                badge['data-status'] = _STATUS[key][1]
 
             if 'OK' not in counts:
                 parent.parent.addClass('moose-civet-fail')
@@ -293,10 +495,11 @@ class RenderCivetTestReport(components.RenderComponent):
 
     def createMaterialize(self, parent, token, page):
 
+        get_results = self.extension.results
         prefix = token['prefix']
-        for key in token['tests']:
-            tname = '{}.{}'.format(prefix, key) if (prefix is not None) else key
-            results = self.extension.results(tname)
+        names = token['tests'] if (prefix is None) else [f'{prefix}.{t}' for t in token['tests']]
+        for tname in names:
+            results = get_results(tname)
 
             div = html.Tag(parent, 'div', class_='moose-civet-test-report')
 
@@ -306,13 +509,12 @@ class RenderCivetTestReport(components.RenderComponent):
             html.Tag(tr, 'th', string='Job')
             html.Tag(tr, 'th', string='Recipe')
 
-            for job, tests in results.items():
-                for item in tests:
-                    tr = html.Tag(tbl, 'tr')
-                    td = html.Tag(tr, 'td', string=item.status)
-                    td['data-status'] = item.status.lower()
-                    tr_job = html.Tag(tr, 'td')
-                    html.Tag(tr, 'td', string=item.recipe)
+            for status, status_lower, recipe, url, job in results:
+                tr = html.Tag(tbl, 'tr')
+                td = html.Tag(tr, 'td', string=status)
+                td['data-status'] = status_lower
+                tr_job = html.Tag(tr, 'td')
+                html.Tag(tr, 'td', string=recipe)
 
-                    link = html.Tag(tr_job, 'span')
-                    html.Tag(link, 'a', href='{}/job/{}'.format(item.url, job), string=str(job))
+                link = html.Tag(tr_job, 'span')
+                html.Tag(link, 'a', href='{}/job/{}'.format(url, job), string=job)
@@ -16,6 +16,7 @@ import os
 
 from MooseDocs import common
 from MooseDocs.common import exceptions
+from MooseDocs.tree import pages
 from MooseDocs.extensions import command
 
 class TestTranslator(unittest.TestCase):
@@ -35,5 +36,21 @@ class TestTranslator(unittest.TestCase):
             page = self.translator.findPage('wrong.md')
             self.assertIn('Did you mean', ex.exception.message)
 
+    def testAddPages(self):
+        translator, _ = common.load_config(os.path.join('..', 'config.yml'))
+        n = len(translator.getPages())
+        nodes = [pages.Text(), pages.Text()]
+        translator.addPages(nodes)
+        self.assertEqual(translator.getPages()[n:], nodes)
+        self.assertEqual([page.uid for page in nodes], [n, n + 1])
+
+        nodes = [pages.Text(), pages.Text()]
+        translator.addPages(node for node in nodes)
+        self.assertEqual(translator.getPages()[n + 2:], nodes)
+        self.assertEqual([page.uid for page in nodes], [n + 2, n + 3])
+
+        with self.assertRaises(exceptions.MooseDocsException):
+            self.translator.addPages([pages.Text()])
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
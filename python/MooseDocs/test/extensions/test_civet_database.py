@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+#* This file is part of the MOOSE framework
+#* https://www.mooseframework.org
+#*
+#* All rights reserved, see COPYRIGHT for full restrictions
+#* https://github.com/idaholab/moose/blob/master/COPYRIGHT
+#*
+#* Licensed under LGPL 2.1, please see LICENSE for details
+#* https://www.gnu.org/licenses/lgpl-2.1.html
+"""
+Tests for the CIVET test result database handling that do not require network access.
+"""
+import os
+import glob
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from mooseutils.civet_results import Test
+from MooseDocs.extensions import civet
+
+def make_database():
+    """Return a test result database, as returned by mooseutils.get_civet_results."""
+    return {'kernels/simple_diffusion.test': {101: [Test('recipe_a', 'OK', None, '', 1.0, 'site'),
+                                                    Test('recipe_b', 'FAIL', None, '', 2.0, 'site')],
+                                              102: [Test('recipe_a', 'OK', None, '', 1.5, 'site')]},
+            'kernels/other.test': {101: [Test('recipe_a', 'DIFF', None, '', 1.0, 'site')]}}
+
+class CivetTestCase(unittest.TestCase):
+    def setUp(self):
+        self._local = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self._local)
+
+    def makeExtension(self, **kwargs):
+        """Return a CivetExtension with a mock translator, ready for init()."""
+        kwargs.setdefault('remotes', dict(moose=dict(url='https://civet.inl.gov',
+                                                     repo='idaholab/moose',
+                                                     test_results_cache=self._local)))
+        ext = civet.CivetExtension(**kwargs)
+        translator = mock.MagicMock()
+        translator.findPage.return_value = None
+        translator.get.return_value = '/site'
+        ext.setTranslator(translator)
+        return ext
+
+    def addArchive(self, number):
+        """Create an empty job archive in the local cache directory."""
+        open(os.path.join(self._local, 'results_{}.tar.gz'.format(number)), 'w').close()
+
+class TestResultsCache(CivetTestCase):
+    def testFingerprint(self):
+        fp = civet._results_fingerprint('master', 'moosetest', 'abc')
+        self.assertEqual(len(fp), 16)
+        self.assertEqual(fp, civet._results_fingerprint('master', 'moosetest', 'abc'))
+        self.assertNotEqual(fp, civet._results_fingerprint('master', 'moosetest', 'abd'))
+        self.assertNotEqual(civet._results_fingerprint('ab', 'c'), civet._results_fingerprint('a', 'bc'))
+
+    def testFilename(self):
+        site = ('https://civet.inl.gov', 'idaholab/moose')
+        fname = civet._results_cache_filename(self._local, 'moose', site, ('sha',), 'master', 'moosetest')
+        self.assertEqual(os.path.dirname(fname), self._local)
+        self.assertRegex(os.path.basename(fname), r'^db_moose_[0-9a-f]{16}\.json$')
+
+        other = civet._results_cache_filename(self._local, 'moose', site, ('sha2',), 'master', 'moosetest')
+        self.assertNotEqual(fname, other)
+
+        self.addArchive(101)
+        other = civet._results_cache_filename(self._local, 'moose', site, ('sha',), 'master', 'moosetest')
+        self.assertNotEqual(fname, other)
+
+    def testDumpLoad(self):
+        fname = os.path.join(self._local, 'sub', 'db.json')
+        database = make_database()
+        civet._dump_results_cache(fname, database)
+        self.assertEqual(civet._load_results_cache(fname), database)
+        self.assertEqual(os.listdir(os.path.dirname(fname)), ['db.json'])
+
+    def testLoadMissing(self):
+        self.assertIsNone(civet._load_results_cache(os.path.join(self._local, 'db.json')))
+
+    @mock.patch.object(civet.LOG, 'warning')
+    def testLoadCorrupt(self, mock_warning):
+        fname = os.path.join(self._local, 'db.json')
+        with open(fname, 'w') as fid:
+            fid.write('not json')
+        self.assertIsNone(civet._load_results_cache(fname))
+        mock_warning.assert_called_once()
+
+        # Valid JSON that is not a database of test results
+        with open(fname, 'w') as fid:
+            fid.write('{"test": {"101": [["recipe_a", "OK"]]}}')
+        self.assertIsNone(civet._load_results_cache(fname))
+        self.assertEqual(mock_warning.call_count, 2)
+
+    def testDumpError(self):
+        fname = os.path.join(self._local, 'db.json')
+        with self.assertRaises(Exception):
+            civet._dump_results_cache(fname, {'test': object()})
+        self.assertEqual(os.listdir(self._local), [])
+
+    @mock.patch('mooseutils.get_civet_results')
+    def testGetResults(self, mock_results):
+        site = ('https://civet.inl.gov', 'idaholab/moose')
+        stale = os.path.join(self._local, 'db_moose_0123456789abcdef.json')
+        other = os.path.join(self._local, 'db_moose_app_0123456789abcdef.json')
+        open(stale, 'w').close()
+        open(other, 'w').close()
+
+        # The archive added by the download must be included in the filename
+        def download(*args, **kwargs):
+            self.addArchive(101)
+            return make_database()
+        mock_results.side_effect = download
+
+        database = civet._get_civet_results('moose', self._local, ('sha',), site, ('master', 'moosetest'))
+        self.assertEqual(database, make_database())
+
+        fname = civet._results_cache_filename(self._local, 'moose', site, ('sha',), 'master', 'moosetest')
+        self.assertEqual(civet._load_results_cache(fname), database)
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(other))
+
+    @mock.patch('mooseutils.get_civet_results')
+    @mock.patch('mooseutils.git_is_config', return_value=True)
+    @mock.patch('mooseutils.git_is_branch', return_value=True)
+    @mock.patch.object(civet, '_cached_civet_hashes', return_value=('sha1', 'sha2'))
+    def testInitCache(self, *args):
+        mock_results = args[-1]
+        def download(*args, **kwargs):
+            self.addArchive(101)
+            return make_database()
+        mock_results.side_effect = download
+
+        # First build downloads, the second uses the cache
+        for i in range(2):
+            ext = self.makeExtension(cache_test_results=True)
+            ext.init()
+            self.assertEqual(ext.counts('kernels/simple_diffusion.test'), {'OK': 2, 'FAIL': 1})
+        mock_results.assert_called_once()
+        self.assertEqual(len(glob.glob(os.path.join(self._local, 'db_moose_*.json'))), 1)
+
+class TestInit(CivetTestCase):
+    @mock.patch('mooseutils.get_civet_results')
+    @mock.patch('mooseutils.git_is_config', return_value=True)
+    @mock.patch('mooseutils.git_is_branch', return_value=True)
+    @mock.patch.object(civet, '_cached_civet_hashes', return_value=('sha1', 'sha2'))
+    def testInit(self, *args):
+        database = make_database()
+        database['kernels/flaky.test'] = {103: [Test('recipe_a', 'FAIL', None, '', 1.0, 'site')],
+                                          104: [Test('recipe_a', 'OK', None, '', 1.0, 'site'),
+                                                Test('recipe_b', 'TIMEOUT', None, '', 1.0, 'site')]}
+        args[-1].return_value = database
+
+        ext = self.makeExtension()
+        ext.init()
+        self.assertTrue(ext.hasTestReports())
+
+        # Report rows
+        self.assertEqual(ext.results('kernels/simple_diffusion.test'),
+                         [('OK', 'ok', 'recipe_a', 'site', '101'),
+                          ('FAIL', 'fail', 'recipe_b', 'site', '101'),
+                          ('OK', 'ok', 'recipe_a', 'site', '102')])
+        self.assertEqual(ext.results('kernels/other.test'), [('DIFF', 'diff', 'recipe_a', 'site', '101')])
+        self.assertIsNone(ext.results('wrong.test'))
+
+        # Counts, in the order the status first appears
+        self.assertEqual(list(ext.counts('kernels/simple_diffusion.test').items()), [('OK', 2), ('FAIL', 1)])
+        self.assertEqual(list(ext.counts('kernels/flaky.test').items()),
+                         [('FAIL', 1), ('OK', 1), ('TIMEOUT', 1)])
+        self.assertEqual(ext.counts('wrong.test'), dict())
+
+        # Report pages
+        self.assertEqual(ext.testBaseFileName('kernels/simple_diffusion.test'), 'result_0')
+        self.assertEqual(ext.testBaseFileName('kernels/other.test'), 'result_1')
+        self.assertEqual(ext.testBaseFileName('kernels/flaky.test'), 'result_2')
+        self.assertEqual(ext.testReportFileName('kernels/flaky.test'), '/site/civet/result_2.html')
+        self.assertIsNone(ext.testReportFileName('wrong.test'))
+
+        report_pages = ext.translator.addPages.call_args[0][0]
+        self.assertEqual([p.local for p in report_pages],
+                         ['civet/result_0.md', 'civet/result_1.md', 'civet/result_2.md'])
+        self.assertEqual([p.get('key') for p in report_pages],
+                         ['kernels/simple_diffusion.test', 'kernels/other.test', 'kernels/flaky.test'])
+
+    @mock.patch('mooseutils.git_is_branch', return_value=False)
+    def testInitWrongBranch(self, *args):
+        ext = self.makeExtension()
+        ext.init()
+        self.assertFalse(ext.hasTestReports())
+        self.assertIsNone(ext.results('kernels/simple_diffusion.test'))
+        ext.translator.addPages.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)